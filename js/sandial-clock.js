@@ -68,7 +68,73 @@ function handleOnFocus(focusEvt) {
   
 }
 
-calibrate();
+function startPolling() {
+  calibrate();
+  document.body.onfocus = handleOnFocus;
+  document.body.onblur = handleOnblur;
+}
 
-document.body.onfocus = handleOnFocus;
-document.body.onblur = handleOnblur;
+function stopPolling() {
+  stopClock();
+  if (calibrateTimer !== null) {
+    window.clearTimeout(calibrateTimer);
+  }
+  document.body.onfocus = null;
+  document.body.onblur = null;
+}
+
+// Follow a `sandial.py serve` stream when the clock element has a
+// data-stream URL: the face arrives once, then only the hands path per minute.
+// Polling keeps the clock going until the first face arrives, and takes over
+// again if the stream cannot be reached.
+function startStream(streamUrl) {
+  var objectEl = document.getElementById("sandial-clock-img");
+  var streamEl = null;
+  var failedTries = 0;
+  var source = new EventSource(streamUrl);
+  var faceTimer = window.setTimeout(fallBack, 5000);
+
+  function fallBack() {
+    console.log("Clock stream unavailable. Falling back to polling.");
+    window.clearTimeout(faceTimer);
+    source.close();
+    if (streamEl !== null) {
+      streamEl.parentNode.replaceChild(objectEl, streamEl);
+      streamEl = null;
+      startPolling();
+    }
+  }
+
+  source.addEventListener("face", function (faceEvt) {
+    console.log("Received clock face.");
+    window.clearTimeout(faceTimer);
+    failedTries = 0;
+    if (streamEl === null) {
+      stopPolling();
+      streamEl = document.createElement("div");
+      streamEl.id = objectEl.id;
+      objectEl.parentNode.replaceChild(streamEl, objectEl);
+    }
+    streamEl.innerHTML = faceEvt.data;
+  });
+  source.addEventListener("hands", function (handsEvt) {
+    failedTries = 0;
+    var handsEl = (streamEl !== null) ? streamEl.querySelector("#hands") : null;
+    if (handsEl !== null) {
+      console.log("Changing clock hands to " + handsEvt.lastEventId);
+      handsEl.setAttribute("d", handsEvt.data);
+    }
+  });
+  source.onerror = function () {
+    failedTries++;
+    if (source.readyState === EventSource.CLOSED || failedTries >= 3) {
+      fallBack();
+    }
+  };
+}
+
+var streamUrl = document.getElementById("sandial-clock-img").getAttribute("data-stream");
+startPolling();
+if (streamUrl && window.EventSource) {
+  startStream(streamUrl);
+}
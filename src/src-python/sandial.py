@@ -8,6 +8,10 @@ from collections import deque
 import math
 from io import StringIO
 import array
+import sys
+import traceback
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
 
 __author__ = 'ethan'
 
@@ -114,6 +118,11 @@ class SketchController(object):
         self.x = 0.0
         self.y = 0.0
         self.buddysync = BuddySync()
+        self.verbose = True
+
+    def log(self, msg):
+        if self.verbose:
+            print(msg)
 
     def shake_to_clear(self):
         raise NotImplementedError
@@ -204,7 +213,7 @@ class PiSketchController(SketchController):
 
         self.wait_in_line()
 
-        print("({},{}) --> ({},{})\n".format(old_x, old_y, self.x, self.y))
+        self.log("({},{}) --> ({},{})\n".format(old_x, old_y, self.x, self.y))
 
     def wait_in_line(self):
         for t in self.threads:
@@ -358,7 +367,7 @@ class SVGSketchController(SketchController):
             delta_log = "x --> -{}s --> y".format(move_delta2.seconds + (move_delta2.microseconds / 1000000.0))
         else:
             delta_log = "x --> +{}s --> y".format(move_delta.seconds + (move_delta.microseconds / 1000000.0))
-        print(delta_log)
+        self.log(delta_log)
 
     def _move_x(self, delta_x):
         self.buddysync.buddy_up()
@@ -408,12 +417,16 @@ class SVGSketchController(SketchController):
         self.x_coords.append(self.x)
         self.y_coords.append(self.y)
 
-        print("({},{}) --> ({},{})\n".format(old_x, old_y, self.x, self.y))
+        self.log("({},{}) --> ({},{})\n".format(old_x, old_y, self.x, self.y))
 
     def export_svg(self, as_animated=True):
         self.build_svg(make_animated=as_animated)
         return self.svg_file.getvalue()
 
+    def export_path_d(self):
+        self.build_svg(make_animated=False)
+        return self.path_d_val_buffer.getvalue()
+
 
 def join_threads(threads):
     """
@@ -575,22 +588,22 @@ class ClockSketch(object):
             hour_inner_xf = -hour_inner_slice_adj
             hour_inner_yf = -hour_inner_slice_opp
 
-        print("t_minutes: {}".format(t_minutes))
-        print("t_hours: {}".format(t_hours))
-        print("minute_sector: {}".format(minute_sector))
-        print("local_minute_angle: {}".format(local_minute_angle))
-        print("minute_perimeter_slice: {}".format(minute_perimeter_slice))
-        print("minute_perimeter_x1: {}".format(minute_perimeter_x1))
-        print("minute_perimeter_y1: {}".format(minute_perimeter_y1))
-        print("minute_perimeter_x2: {}".format(minute_perimeter_x2))
-        print("minute_perimeter_y2: {}".format(minute_perimeter_y2))
-        print("minute_perimeter_xf: {}".format(minute_perimeter_xf))
-        print("minute_perimeter_yf: {}".format(minute_perimeter_yf))
-        print("hour_sector: {}".format(hour_sector))
-        print("local_hour_angle: {}".format(local_hour_angle))
-        print("hour_perimeter_slice: {}".format(hour_perimeter_slice))
-        print("hour_inner_xf: {}".format(hour_inner_xf))
-        print("hour_inner_yf: {}".format(hour_inner_yf))
+        self.sc.log("t_minutes: {}".format(t_minutes))
+        self.sc.log("t_hours: {}".format(t_hours))
+        self.sc.log("minute_sector: {}".format(minute_sector))
+        self.sc.log("local_minute_angle: {}".format(local_minute_angle))
+        self.sc.log("minute_perimeter_slice: {}".format(minute_perimeter_slice))
+        self.sc.log("minute_perimeter_x1: {}".format(minute_perimeter_x1))
+        self.sc.log("minute_perimeter_y1: {}".format(minute_perimeter_y1))
+        self.sc.log("minute_perimeter_x2: {}".format(minute_perimeter_x2))
+        self.sc.log("minute_perimeter_y2: {}".format(minute_perimeter_y2))
+        self.sc.log("minute_perimeter_xf: {}".format(minute_perimeter_xf))
+        self.sc.log("minute_perimeter_yf: {}".format(minute_perimeter_yf))
+        self.sc.log("hour_sector: {}".format(hour_sector))
+        self.sc.log("local_hour_angle: {}".format(local_hour_angle))
+        self.sc.log("hour_perimeter_slice: {}".format(hour_perimeter_slice))
+        self.sc.log("hour_inner_xf: {}".format(hour_inner_xf))
+        self.sc.log("hour_inner_yf: {}".format(hour_inner_yf))
 
         self.walk_perimeter_to(minute_perimeter_xf, minute_perimeter_yf)
 
@@ -639,6 +652,178 @@ class SVGClockSketch(ClockSketch):
         self._refresh_clock(t_hours=t_hours, t_minutes=t_minutes, animated=animated)
         return self.sc.export_svg(as_animated=animated)
 
+    def export_face_d(self):
+        self.reset()
+        self.paint_clockface()
+        return self.sc.export_path_d()
+
+    def export_hands_d(self, face_d, t_hours=3.0, t_minutes=0.1):
+        # The face always ends back at the origin, so the hands are whatever
+        # the full path draws after the face prefix.
+        self._refresh_clock(t_hours=t_hours, t_minutes=t_minutes, animated=False)
+        full_d = self.sc.export_path_d()
+        if not full_d.startswith(face_d):
+            raise Exception("HEY! The clock path does not start with the clock face!")
+        return "M0 0{}".format(full_d[len(face_d):])
+
+
+class ClockStream(object):
+    """
+    Renders one hands frame per minute and shares it with every subscriber.
+    The next minute is rendered ahead of time so publishing is just a swap.
+    """
+    def __init__(self, clock_sketch):
+        self.cs = clock_sketch
+        self.face_d = self.cs.export_face_d()
+        self.face_svg = self._build_face_svg()
+        self.frame_cond = threading.Condition()
+        self.frame_seq = 0
+        self.frame = None
+        self.running = False
+        self.thread = None
+        self.max_sleep = 1.0
+        self.retry_sleep = 5.0
+
+    def _build_face_svg(self):
+        sc = self.cs.sc
+        face_buf = StringIO()
+        face_buf.write(sc.svg_header)
+        face_buf.write("<g transform=\"translate({0} {0})\">\n".format(sc.svg_margin))
+        face_buf.write("<path id=\"face\" stroke=\"black\" stroke-width=\"3\" fill=\"transparent\" d=\"")
+        face_buf.write(self.face_d)
+        face_buf.write("\"/>\n")
+        face_buf.write("<path id=\"hands\" stroke=\"black\" stroke-width=\"3\" fill=\"transparent\" d=\"M0 0\"/>\n")
+        face_buf.write("</g>\n</svg>\n")
+        face_svg = face_buf.getvalue()
+        face_buf.close()
+        return face_svg
+
+    def render_frame(self, t_when):
+        hands_d = self.cs.export_hands_d(self.face_d, t_hours=float(t_when.hour), t_minutes=float(t_when.minute))
+        return "{:0>2d}_{:0>2d}".format(t_when.hour, t_when.minute), hands_d
+
+    def publish(self, frame):
+        with self.frame_cond:
+            self.frame = frame
+            self.frame_seq += 1
+            self.frame_cond.notify_all()
+
+    def wait_for_frame(self, last_seq, timeout=None):
+        with self.frame_cond:
+            if self.frame_seq == last_seq and self.running:
+                self.frame_cond.wait(timeout)
+            return self.frame_seq, self.frame
+
+    def _run(self):
+        published_minute = next_minute = next_frame = None
+        while self.running:
+            try:
+                # Re-read the wall clock every pass so DST changes, NTP steps and
+                # suspend/resume re-sync to the current minute instead of replaying.
+                this_minute = datetime.datetime.now().replace(second=0, microsecond=0)
+                if this_minute != published_minute:
+                    if this_minute != next_minute:
+                        next_frame = self.render_frame(this_minute)
+                    self.publish(next_frame)
+                    published_minute = this_minute
+                    # Forget the old frame first so a failed pre-render is redone
+                    # at the boundary instead of publishing a stale frame.
+                    next_minute = next_frame = None
+                    next_frame = self.render_frame(this_minute + datetime.timedelta(minutes=1))
+                    next_minute = this_minute + datetime.timedelta(minutes=1)
+
+                time_diff = (published_minute + datetime.timedelta(minutes=1)) - datetime.datetime.now()
+                if time_diff.days >= 0:
+                    sleep(min(self.max_sleep, time_diff.seconds + (time_diff.microseconds / 1000000.0)))
+            except Exception:
+                # Keep the stream alive and retry the failed minute on the next pass
+                traceback.print_exc()
+                sleep(self.retry_sleep)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        with self.frame_cond:
+            self.running = False
+            self.frame_cond.notify_all()
+
+
+class ClockStreamHandler(BaseHTTPRequestHandler):
+    """
+    Server-Sent Events endpoint: the face is sent once as a `face` event,
+    then each minute a `hands` event carries only the hands path d value.
+    """
+    def _write_event(self, event, data, event_id=None):
+        event_buf = StringIO()
+        if event_id is not None:
+            event_buf.write("id: {}\n".format(event_id))
+        event_buf.write("event: {}\n".format(event))
+        for data_line in data.splitlines():
+            event_buf.write("data: {}\n".format(data_line))
+        event_buf.write("\n")
+        self.wfile.write(event_buf.getvalue().encode("utf-8"))
+        self.wfile.flush()
+        event_buf.close()
+
+    def do_GET(self):
+        if self.path != "/stream":
+            self.send_error(404)
+            return
+        stream = self.server.clock_stream
+        if not stream.running:
+            self.send_error(503)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+
+        last_seq = 0
+        try:
+            self._write_event("face", stream.face_svg)
+            while stream.running:
+                frame_seq, frame = stream.wait_for_frame(last_seq, timeout=15)
+                if frame_seq == last_seq:
+                    self.wfile.write(": keepalive\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    continue
+                last_seq = frame_seq
+                frame_id, hands_d = frame
+                self._write_event("hands", hands_d, event_id=frame_id)
+        except (IOError, OSError):
+            pass  # viewer went away
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve(host="127.0.0.1", port=8080):
+    sc = SVGSketchController()
+    sc.verbose = False
+    cs = SVGClockSketch(sc)
+    stream = ClockStream(cs)
+    stream.start()
+    httpd = ThreadingHTTPServer((host, port), ClockStreamHandler)
+    httpd.clock_stream = stream
+    print("Streaming clock on http://{}:{}/stream".format(host, port))
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nKeyboardInterrupt catched.")
+        print("Stop streaming the clock.")
+    finally:
+        stream.stop()
+        httpd.server_close()
+
 
 def main():
 
@@ -662,4 +847,7 @@ def main():
         exit(1)
 
 if __name__ == '__main__':
-    main()
+    if sys.argv[1:2] == ["serve"]:
+        serve()
+    else:
+        main()